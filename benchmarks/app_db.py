@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# This file is part of Spamalot Launcher.
+#
+# Spamalot Launcher is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Spamalot Launcher is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Spamalot Launcher.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare memory use and query time of the application database formats.
+
+"legacy" is the former list of per-application dicts matched with
+lowercased copies on every query; "compact" is the current
+ApplicationDatabase of parallel arrays with a precomputed search string.
+Each format is pickled like the launcher cache, then loaded and queried in
+its own process so their resident set sizes don't mix.
+"""
+
+import argparse
+import gc
+import os
+import os.path
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import spamalot_launcher
+
+WORDS = ('fire', 'fox', 'term', 'inal', 'office', 'writer', 'calc', 'image',
+         'view', 'edit', 'media', 'player', 'mail', 'chat', 'code', 'git',
+         'paint', 'sound', 'video', 'system', 'settings', 'monitor', 'disk',
+         'usage', 'text', 'note', 'book', 'reader', 'web', 'browser')
+QUERIES = ('fire', 'Term', 'x', 'player', 'no-such-application')
+
+
+def corpus(size):
+    rng = random.Random(0)
+    for index in range(size):
+        words = rng.sample(WORDS, 3)
+        name = ' '.join(word.capitalize() for word in words)
+        command = '-'.join(words)
+        yield (f'/usr/share/applications/{command}-{index}.desktop', name,
+               command, f'/usr/bin/{command} %U', float(index))
+
+
+def build(variant, size):
+    if variant == 'legacy':
+        return [{'path': path, 'name': name, 'icon': icon, 'exec': exec_}
+                for path, name, icon, exec_, __ in corpus(size)]
+    return spamalot_launcher.ApplicationDatabase(
+        (path, name, icon,
+         spamalot_launcher.ApplicationDatabase.search_key(name, exec_), mtime)
+        for path, name, icon, exec_, mtime in corpus(size))
+
+
+def query(variant, app_db, search):
+    if variant == 'legacy':
+        return [app for app in app_db
+                if (search.lower() in app['name'].lower() or
+                    search.lower() in app['exec'].lower())]
+    return app_db.find(search)
+
+
+def rss_kib():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+
+
+def measure(variant, cache, repeat):
+    gc.collect()
+    before = rss_kib()
+    start = time.perf_counter()
+    with open(cache, 'rb') as pickle_db:
+        app_db = pickle.load(pickle_db)
+    load_time = time.perf_counter() - start
+    gc.collect()
+    rss = rss_kib() - before
+
+    start = time.perf_counter()
+    for __ in range(repeat):
+        for search in QUERIES:
+            query(variant, app_db, search)
+    query_time = (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+    print(f'{variant:<8} RSS +{rss / 1024:6.1f} MiB  '
+          f'cache {os.path.getsize(cache) / 2 ** 20:5.1f} MiB '
+          f'(load {load_time * 1000:6.1f} ms)  '
+          f'query {query_time * 1000:6.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--variant', choices=('legacy', 'compact'))
+    parser.add_argument('--cache')
+    args = parser.parse_args()
+
+    if args.variant is not None:
+        measure(args.variant, args.cache, args.repeat)
+        return
+
+    print(f'{args.size} applications, {len(QUERIES)} queries:')
+    sys.stdout.flush()
+    with tempfile.TemporaryDirectory() as directory:
+        for variant in ('legacy', 'compact'):
+            cache = os.path.join(directory, variant)
+            with open(cache, 'wb') as pickle_db:
+                pickle.dump(build(variant, args.size), pickle_db, protocol=2)
+            subprocess.check_call([sys.executable, __file__,
+                                   '--variant', variant, '--cache', cache,
+                                   '--repeat', str(args.repeat)])
+
+
+if __name__ == '__main__':
+    main()
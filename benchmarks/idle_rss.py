@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# This file is part of Spamalot Launcher.
+#
+# Spamalot Launcher is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Spamalot Launcher is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Spamalot Launcher.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Track resident memory over a long synthetic usage session.
+
+Each cycle shows the window, runs a batch of searches, and hides it again.
+"baseline" keeps everything resident and evaluates "==" in-process;
+"reclaim" runs the idle policy after every hide (as if "idle timeout" had
+elapsed) and evaluates "==" in the sympy subprocess. Each variant runs in
+its own process, on a temporary home directory with synthetic .desktop
+files, using the offscreen Qt platform unless told otherwise.
+"""
+
+import argparse
+import json
+import os
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import spamalot_launcher
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtWidgets import QApplication
+
+QUERIES = ('', 'a', 'e', 'fire', 'term', 'ls', '=2**64', '=sqrt(ans)',
+           '==expand((x+y)**6)', '==integrate(sin(x)**2, x)',
+           '==series(exp(x), x, 0, 8)', '/', '~/', 'command stats')
+WORDS = ('fire', 'fox', 'term', 'inal', 'office', 'writer', 'calc', 'image',
+         'view', 'edit', 'media', 'player', 'mail', 'chat', 'code', 'git')
+
+
+def rss_kib(pid='self'):
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def make_home(directory, variant, applications):
+    desktop_dir = os.path.join(directory, 'applications')
+    os.makedirs(desktop_dir)
+    for index in range(applications):
+        words = [WORDS[(index * 7 + offset) % len(WORDS)]
+                 for offset in range(3)]
+        with open(os.path.join(desktop_dir, f'app{index}.desktop'),
+                  'w') as desktop_file:
+            desktop_file.write('[Desktop Entry]\n'
+                               f'Name={" ".join(words).title()} {index}\n'
+                               f'Exec={"-".join(words)} %U\n'
+                               f'Icon={words[0]}\n')
+    config = json.loads(spamalot_launcher.DEFAULT_CONFIG)
+    config.update({'desktop paths': [desktop_dir],
+                   'favorite apps': ['Fire Fox Term 0'],
+                   'idle timeout': None,
+                   'sympy subprocess': variant == 'reclaim'})
+    with open(os.path.join(directory, '.spamalot_launcher.config.json'),
+              'w') as config_file:
+        json.dump(config, config_file)
+
+
+def pump(seconds=0.0):
+    end = time.monotonic() + seconds
+    while True:
+        QCoreApplication.processEvents()
+        if time.monotonic() >= end:
+            return
+        time.sleep(0.005)
+
+
+def run_search(text):
+    searcher = spamalot_launcher.searcher
+    spamalot_launcher.search_bar.setText(text)
+    searcher.search(text)
+    # Workers are deleted once their results have been delivered.
+    while not all(map(spamalot_launcher.sip.isdeleted, searcher.workers)):
+        pump(0.005)
+
+
+def sympy_child_pid():
+    calculator = spamalot_launcher.searcher.find_provider(
+        spamalot_launcher.CalculatorProvider)
+    worker = calculator and calculator._sympy_worker
+    if worker is not None and worker._process is not None:
+        return worker._process.pid
+    return None
+
+
+def session(variant, cycles, report_every):
+    app = QApplication(sys.argv)
+    spamalot_launcher.app = app
+    spamalot_launcher.executor = spamalot_launcher.CommandExecutor()
+    spamalot_launcher.build_window()
+    pump(2)  # Let the providers load.
+
+    print(f'{variant}:')
+    print(f'{"cycle":>7} {"launcher RSS":>14} {"sympy child RSS":>16}')
+    for cycle in range(cycles + 1):
+        if cycle % report_every == 0:
+            pid = sympy_child_pid()
+            child = f'{rss_kib(pid) / 1024:12.1f} MiB' if pid else '-'
+            print(f'{cycle:>7} {rss_kib() / 1024:10.1f} MiB {child:>16}')
+            sys.stdout.flush()
+        if cycle == cycles:
+            break
+        spamalot_launcher.main_window.show()
+        for text in QUERIES:
+            run_search(text)
+        spamalot_launcher.close()
+        pump()
+        if variant == 'reclaim':
+            spamalot_launcher.idle_reclaimer.reclaim()
+    app.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--report-every', type=int, default=25)
+    parser.add_argument('--applications', type=int, default=2000)
+    parser.add_argument('--variant', choices=('baseline', 'reclaim'))
+    args = parser.parse_args()
+
+    if args.variant is not None:
+        session(args.variant, args.cycles, args.report_every)
+        return
+
+    for variant in ('baseline', 'reclaim'):
+        with tempfile.TemporaryDirectory() as home:
+            make_home(home, variant, args.applications)
+            subprocess.check_call(
+                [sys.executable, __file__, '--variant', variant,
+                 '--cycles', str(args.cycles),
+                 '--report-every', str(args.report_every)],
+                env=dict(os.environ, HOME=home))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# This file is part of Spamalot Launcher.
+#
+# Spamalot Launcher is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Spamalot Launcher is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Spamalot Launcher.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare application launch latency of direct launching and exo-open.
+
+A stub application writes to a FIFO as soon as it runs; the latency is the
+time from asking the launcher to start it until that write arrives.
+"""
+
+import argparse
+import os
+import os.path
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import spamalot_launcher
+
+STUB = '#!/bin/sh\nprintf x > "$1"\n'
+DESKTOP_ENTRY = '''[Desktop Entry]
+Type=Application
+Name=Launch Latency Stub
+Exec="{stub}" "{fifo}" %U
+'''
+# Give up on a run if the stub hasn't started after this many seconds.
+RUN_TIMEOUT = 10
+
+
+def wait_for_stub(fifo):
+    received = []
+    reader = threading.Thread(
+        target=lambda: received.append(open(fifo).read()), daemon=True)
+    reader.start()
+    reader.join(RUN_TIMEOUT)
+    if not received:
+        # Unblock the reader so the next run starts clean.
+        with open(fifo, 'w'):
+            pass
+        reader.join()
+        return False
+    return True
+
+
+def measure(launch, fifo, runs):
+    latencies = []
+    for __ in range(runs):
+        start = time.perf_counter()
+        launch()
+        if not wait_for_stub(fifo):
+            print('  stub did not start', file=sys.stderr)
+            return None
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label, latencies):
+    if latencies is None:
+        print(f'{label:<14} failed')
+        return
+    print(f'{label:<14} '
+          f'min {min(latencies) * 1000:7.2f} ms  '
+          f'median {statistics.median(latencies) * 1000:7.2f} ms  '
+          f'mean {statistics.mean(latencies) * 1000:7.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--open-command', default='exo-open')
+    args = parser.parse_args()
+
+    spamalot_launcher.executor = spamalot_launcher.CommandExecutor()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stub = os.path.join(directory, 'stub')
+        with open(stub, 'w') as stub_file:
+            stub_file.write(STUB)
+        os.chmod(stub, 0o755)
+        fifo = os.path.join(directory, 'fifo')
+        os.mkfifo(fifo)
+        desktop = os.path.join(directory, 'stub.desktop')
+        with open(desktop, 'w') as desktop_file:
+            desktop_file.write(DESKTOP_ENTRY.format(stub=stub, fifo=fifo))
+
+        print(f'{args.runs} launches of a stub application:')
+        report('direct', measure(
+            lambda: spamalot_launcher.launch_desktop_entry(desktop),
+            fifo, args.runs))
+
+        open_command = args.open_command.split()
+        if shutil.which(open_command[0]) is None:
+            print(f'{args.open_command!r} not found, skipping.')
+        else:
+            report(open_command[0], measure(
+                lambda: spamalot_launcher.executor.spawn(
+                    open_command + [desktop]),
+                fifo, args.runs))
+
+
+if __name__ == '__main__':
+    main()
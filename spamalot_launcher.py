@@ -21,6 +21,27 @@ import sys
 import time
 import logging
 
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove('--profile-startup')
+startup_marks = [('start', time.perf_counter())]
+
+
+def mark_startup(label):
+    """Record a point on the start-up timeline (see --profile-startup)."""
+    if PROFILE_STARTUP:
+        startup_marks.append((label, time.perf_counter()))
+
+
+def print_startup_timeline():
+    if not PROFILE_STARTUP:
+        return
+    start = startup_marks[0][1]
+    print('Start-up timeline (ms since launch):', file=sys.stderr)
+    for label, mark in startup_marks:
+        print(f'{(mark - start) * 1000:9.1f}  {label}', file=sys.stderr)
+
+
 logger = logging.getLogger()
 ## logger.setLevel(logging.DEBUG)
 logging.debug('Logging is enabled.')
@@ -40,6 +61,8 @@ text = 'none'
 homePage = 'github.com/spamalot/spamalot_launcher'
 bugEmail = 'spamalot@users.noreply.github.com'
 
+mark_startup('import sip')
+
 from PyQt5.QtCore import Qt, QSharedMemory
 from PyQt5.QtWidgets import QApplication, QShortcut
 from PyQt5.QtGui import QKeySequence
@@ -47,6 +70,8 @@ from PyQt5.QtGui import QKeySequence
 from PyQt5.QtCore import QIODevice, pyqtSignal, QObject, QCoreApplication
 from PyQt5.QtNetwork import QLocalServer, QLocalSocket
 
+mark_startup('import PyQt5 (single-instance check)')
+
 class Lock(QObject):
 
     ready = pyqtSignal()
@@ -97,25 +122,34 @@ class Lock(QObject):
 
 
 # Delay loading resources until after single-instance check to ensure faster
-# start-up times of existing instance.
+# start-up times of existing instance. Modules only needed by providers
+# (glob, pickle, xml.etree) or by the command executor (asyncio) are imported
+# on first use instead.
+import array
+import bisect
+import builtins
+import gc
 import subprocess
 import os
 import os.path
-import glob
 import re
-import pickle
+import shlex
+import signal
 import math
 import json
 import functools
-import xml.etree.ElementTree as ET
+import threading
 
 
-from PyQt5.QtCore import Qt, QObject, QEvent, pyqtSignal, QThread, QSize, QUrl
+from PyQt5.QtCore import (Qt, QObject, QEvent, pyqtSignal, QThread, QSize, QUrl,
+                          QTimer, QFileSystemWatcher)
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout,
                          QAbstractItemView, QListWidgetItem,
                           QLineEdit, QListWidget)
 from PyQt5.QtGui import  QPalette, QFont, QBrush, QIcon
 
+mark_startup('import PyQt5 (widgets)')
+
 
 # NOTE: Use exo-open because it doesn't have this ages old bug:
 # https://bugs.launchpad.net/ubuntu/+source/glib2.0/+bug/378783
@@ -129,40 +163,420 @@ DEFAULT_CONFIG = '''
     "favorite apps": [],
     "favorites directory": "",
     "open command": "exo-open",
+    "direct launch": true,
     "file manager command": "dolphin",
     "reveal in file manager command": "dolphin --select",
     "icon size": 48,
-    "translucent background": true
+    "translucent background": true,
+    "idle timeout": 300,
+    "idle cache budget": 16,
+    "sympy subprocess": true
 }
 '''
 CONFIG_PATH = '~/.spamalot_launcher.config.json'
 CACHE_PATH = '~/.spamalot_launcher.cache'
+USER_PLACES_PATH = '~/.local/share/user-places.xbel'
 WINDOW_TITLE = 'Spamalot Launcher'
 
 MATH_BUILTINS = ('min', 'max', 'abs', 'hex', 'bin', 'int', 'oct', 'bool')
 
+# Limits for commands run by providers (not for launched programs).
+COMMAND_TIMEOUT = 5
+MAX_CONCURRENT_COMMANDS = 4
+# How long "which" lookups are reused for.
+WHICH_TTL = 60
+
+# Exec field codes that stand for files, URLs or deprecated values. The
+# launcher never passes any of them, so they expand to nothing.
+DROPPED_FIELD_CODES = ('%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%v',
+                       '%m')
+DESKTOP_STRING_ESCAPES = {'s': ' ', 'n': '\n', 't': '\t', 'r': '\r',
+                          '\\': '\\'}
+
+# Seconds to wait for the sympy subprocess before giving up on a result.
+SYMPY_TIMEOUT = 30
+# Evaluates "==" expressions for the launcher, one JSON request per line.
+SYMPY_WORKER_SCRIPT = r'''
+import json
+import os
+import sys
+
+# Keep the replies on their own copy of stdout, and send anything the
+# expressions print (e.g. pprint) to stderr instead.
+replies = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+sys.stdout = sys.stderr
+
+try:
+    import sympy
+except ImportError:
+    sympy = None
+else:
+    locals_ = {name: getattr(sympy, name) for name in dir(sympy)
+               if not name.startswith('_')}
+    for variable in ('x', 'y', 'z'):
+        locals_[variable] = sympy.var(variable)
+    for builtin in (len, str):
+        locals_[builtin.__name__] = builtin
+
+
+def plain(value):
+    """Return a value the launcher's own calculator can use as "ans"."""
+    if isinstance(value, (int, float, str)):
+        return value
+    if getattr(value, 'is_Integer', False):
+        return int(value)
+    if getattr(value, 'is_Rational', False) or getattr(value, 'is_Float',
+                                                       False):
+        return float(value)
+    return None
+
+
+for line in sys.stdin:
+    request = json.loads(line)
+    if sympy is None:
+        reply = {'error': '"sympy" not found.'}
+    else:
+        try:
+            locals_['ans'] = (None if request['ans'] is None
+                              else sympy.sympify(request['ans']))
+            # Not safe in the least, but will prevent honest mistakes
+            ans = eval(request['expression'], {'__builtins__': None},
+                       locals_)
+            reply = {'result': sympy.pretty(ans, use_unicode=True),
+                     'ans': sympy.srepr(ans), 'value': plain(ans)}
+        except Exception as err:
+            reply = {'error': str(err)}
+    print(json.dumps(reply), file=replies, flush=True)
+'''
+
 ItemTypeRole = Qt.UserRole
 ItemDataRole = Qt.UserRole + 1
 
 
+class CommandStats(object):
+
+    __slots__ = ('spawns', 'cache_hits', 'collapsed', 'timeouts',
+                 'total_latency', 'max_latency')
+
+    def __init__(self):
+        self.spawns = 0
+        self.cache_hits = 0
+        self.collapsed = 0
+        self.timeouts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def add_latency(self, latency):
+        self.spawns += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+
+class CommandExecutor(object):
+
+    """Run external commands on an asyncio loop in a helper thread.
+
+    Providers call ``check_output`` from search threads and block only on
+    their own result. Commands are killed after a timeout, at most
+    ``max_concurrent`` of them run at once, identical commands already in
+    flight are shared, and results may be reused for ``ttl`` seconds.
+    Programs started with ``spawn`` are not waited for, but are reaped when
+    they exit. The loop and its thread are started on first use.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_COMMANDS):
+        self.max_concurrent = max_concurrent
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+        self._stats = {}
+        self._loop = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                import asyncio
+
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever,
+                                 name='CommandExecutor', daemon=True).start()
+                mark_startup('command executor started')
+            return self._loop
+
+    def _stats_for(self, args):
+        name = os.path.basename(args[0])
+        if name not in self._stats:
+            self._stats[name] = CommandStats()
+        return self._stats[name]
+
+    def stats(self):
+        """Return a snapshot of the per-command counters."""
+        with self._lock:
+            return {name: dict((slot, getattr(stats, slot))
+                               for slot in CommandStats.__slots__)
+                    for name, stats in self._stats.items()}
+
+    def check_output(self, args, *, stderr=False, check=True, ttl=0,
+                     timeout=COMMAND_TIMEOUT):
+        """Run ``args`` and return its output, like subprocess.check_output.
+
+        Raises subprocess.CalledProcessError on a non-zero exit status (unless
+        ``check`` is false) and subprocess.TimeoutExpired on timeout.
+        """
+        import asyncio
+
+        loop = self._get_loop()
+        key = (tuple(args), stderr)
+        on_done = None
+        with self._lock:
+            stats = self._stats_for(args)
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                stats.cache_hits += 1
+                returncode, output = cached[1]
+                future = None
+            elif key in self._in_flight:
+                stats.collapsed += 1
+                future = self._in_flight[key]
+            else:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._run(args, stderr, timeout), loop)
+                self._in_flight[key] = future
+                on_done = functools.partial(self._on_run_done, key, ttl)
+
+        # Outside the lock: the callback runs immediately (and takes the lock)
+        # if the command has already finished.
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        if future is not None:
+            returncode, output = future.result()
+        if check and returncode:
+            raise subprocess.CalledProcessError(returncode, args, output)
+        return output
+
+    def trim(self):
+        """Forget cached results that have expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._results = {key: result for key, result in
+                             self._results.items() if result[0] > now}
+
+    def _on_run_done(self, key, ttl, future):
+        with self._lock:
+            del self._in_flight[key]
+            if ttl and not future.cancelled() and future.exception() is None:
+                self._results[key] = (time.monotonic() + ttl, future.result())
+
+    async def _run(self, args, stderr, timeout):
+        import asyncio
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self._semaphore:
+            start = time.perf_counter()
+            # In its own process group, so that a timeout also kills any
+            # children still holding the output pipe open.
+            process = await asyncio.create_subprocess_exec(
+                *args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT if stderr else subprocess.DEVNULL,
+                start_new_session=True)
+            try:
+                output, __ = await asyncio.wait_for(process.communicate(),
+                                                    timeout)
+            except asyncio.TimeoutError:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+                with self._lock:
+                    self._stats_for(args).timeouts += 1
+                raise subprocess.TimeoutExpired(args, timeout)
+            finally:
+                with self._lock:
+                    self._stats_for(args).add_latency(
+                        time.perf_counter() - start)
+            return process.returncode, output
+
+    def spawn(self, args, *, shell=False):
+        """Start a program without waiting for it, reaping it on exit."""
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._spawn(args, shell), self._get_loop())
+        future.add_done_callback(functools.partial(self._on_spawn_done, args))
+
+    def spawn_direct(self, args):
+        """Start a program with posix_spawn, bypassing the event loop.
+
+        Raises OSError if the program cannot be started.
+        """
+        start = time.perf_counter()
+        # Like subprocess's restore_signals and start_new_session: programs
+        # shouldn't inherit the signals Python ignores, nor our session.
+        pid = os.posix_spawnp(args[0], args, os.environ,
+                              setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+                              setsid=True)
+        with self._lock:
+            self._stats_for(args).add_latency(time.perf_counter() - start)
+        threading.Thread(target=os.waitpid, args=(pid, 0),
+                         name=f'reap {pid}', daemon=True).start()
+        return pid
+
+    def _on_spawn_done(self, args, future):
+        if future.exception() is not None:
+            logging.error(f'Could not launch {args!r}: {future.exception()}')
+
+    async def _spawn(self, args, shell):
+        import asyncio
+
+        start = time.perf_counter()
+        if shell:
+            process = await asyncio.create_subprocess_shell(
+                args, start_new_session=True)
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *args, start_new_session=True)
+        with self._lock:
+            self._stats_for(['sh'] if shell else args).add_latency(
+                time.perf_counter() - start)
+        await process.wait()
+
+
+class CommandStatsProvider(object):
+
+    def provide(self, search):
+        if search.lower() != 'command stats':
+            yield False
+        for name, stats in sorted(executor.stats().items()):
+            average = stats['total_latency'] / max(stats['spawns'], 1)
+            item = QListWidgetItem(
+                f'{name:<16} {stats["spawns"]:>5} run  '
+                f'{stats["cache_hits"]:>5} cached  '
+                f'{stats["collapsed"]:>5} shared  '
+                f'{stats["timeouts"]:>3} timed out  '
+                f'avg {average * 1000:7.1f} ms  '
+                f'max {stats["max_latency"] * 1000:7.1f} ms')
+            item.setFont(QFont(config_options['monospace font']))
+            item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
+            yield item
+        yield True
+
+
 class DictionaryProvider(object):
 
     def provide(self, search):
         if search.startswith('define ') and search != 'define ':
-            item = QListWidgetItem(
-                subprocess.check_output('dict {}; exit 0'.format(search[7:]),
-                                        stderr=subprocess.STDOUT, shell=True).decode('utf-8'))
+            try:
+                output = executor.check_output(
+                    ['dict'] + search[7:].split(), stderr=True,
+                    check=False).decode('utf-8')
+            except (OSError, subprocess.TimeoutExpired) as err:
+                output = str(err)
+            item = QListWidgetItem(output)
             item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
             yield item
             yield True
         yield False
 
 
+class SympyWorker(object):
+
+    """Evaluate sympy expressions in a child process.
+
+    This keeps sympy, and whatever it allocates, out of the long-lived
+    launcher process. The child is closed when the launcher goes idle and
+    started again on the next "==" search.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+
+    def evaluate(self, expression, ans):
+        """Return the child's reply to ``expression`` as a dict.
+
+        ``ans`` is a string for sympy.sympify (or None), since objects
+        don't survive the child being closed.
+        """
+        import select
+
+        with self._lock:
+            if self._process is None:
+                self._process = subprocess.Popen(
+                    [sys.executable, '-c', SYMPY_WORKER_SCRIPT],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            request = json.dumps({'expression': expression, 'ans': ans})
+            try:
+                self._process.stdin.write(request.encode('utf-8') + b'\n')
+                self._process.stdin.flush()
+                ready, __, __ = select.select([self._process.stdout], [], [],
+                                              SYMPY_TIMEOUT)
+                line = self._process.stdout.readline() if ready else b''
+            except OSError as err:
+                self._stop()
+                return {'error': str(err)}
+            if not ready:
+                self._stop()
+                return {'error': f'Timed out after {SYMPY_TIMEOUT} seconds.'}
+            if not line:
+                self._stop()
+                return {'error': 'The sympy process exited unexpectedly.'}
+            try:
+                return json.loads(line.decode('utf-8'))
+            except ValueError as err:
+                # Whatever the child wrote, its later replies can't be
+                # trusted to line up with their requests.
+                self._stop()
+                return {'error': f'Bad reply from the sympy process: {err}'}
+
+    def close(self):
+        """Stop the child, unless it is busy evaluating."""
+        if self._lock.acquire(blocking=False):
+            try:
+                self._stop()
+            finally:
+                self._lock.release()
+
+    def _stop(self):
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        try:
+            self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
 class CalculatorProvider(object):
 
     def __init__(self):
         self.ans = None
         self.sympy = None
+        # "ans" in a form the sympy subprocess can rebuild it from.
+        self.sympy_ans = None
+        self._sympy_worker = None
+
+    def trim(self, budget):
+        if self._sympy_worker is not None:
+            self._sympy_worker.close()
+
+    def _provide_from_worker(self, search):
+        if self._sympy_worker is None:
+            self._sympy_worker = SympyWorker()
+        reply = self._sympy_worker.evaluate(search.lstrip('='),
+                                            self.sympy_ans)
+        if 'error' in reply:
+            return QListWidgetItem(reply['error'])
+        self.ans = reply['value']
+        self.sympy_ans = reply['ans']
+        item = QListWidgetItem(reply['result'])
+        item.setFont(QFont(config_options['monospace font']))
+        return item
 
     def sympy_prettify(self, object_):
         return self.sympy.pretty(object_, use_unicode=True)
@@ -170,6 +584,9 @@ class CalculatorProvider(object):
     def provide(self, search):
         if not search.startswith('='):
             yield False
+        if search.startswith('==') and config_options['sympy subprocess']:
+            yield self._provide_from_worker(search)
+            yield True
         if search.startswith('=='):
             if self.sympy is None:
                 try:
@@ -190,7 +607,7 @@ class CalculatorProvider(object):
                        (attribute for attribute in dir(math)
                         if not attribute.startswith('_'))}
             for builtin in MATH_BUILTINS:
-                locals_[builtin] = getattr(__builtins__, builtin)
+                locals_[builtin] = getattr(builtins, builtin)
             prettify = str
         try:
             locals_['ans'] = self.ans
@@ -199,6 +616,8 @@ class CalculatorProvider(object):
             # Not safe in the least, but will prevent honest mistakes
             self.ans = eval(search.lstrip('='), {'__builtins__': None},
                             locals_)
+            self.sympy_ans = (repr(self.ans)
+                              if isinstance(self.ans, (int, float)) else None)
             item = QListWidgetItem(prettify(self.ans))
             # Disabled to allow copy-paste of results
             #item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
@@ -215,8 +634,10 @@ class CommandLineProvider(object):
         if not search:
             yield False
         try:
-            subprocess.check_call(['which', '--', search.split()[0]])
-        except subprocess.CalledProcessError:
+            executor.check_output(['which', '--', search.split()[0]],
+                                  ttl=WHICH_TTL)
+        except (OSError, subprocess.CalledProcessError,
+                subprocess.TimeoutExpired):
             pass
         else:
             item = QListWidgetItem(search)
@@ -228,33 +649,143 @@ class CommandLineProvider(object):
 
 
 
-def load_cache(*, provider, generator):
-    key = provider.__class__.__name__
+# Providers load and refresh from background threads, and each one rewrites
+# the whole cache file, so reads and writes must not interleave.
+cache_lock = threading.Lock()
 
-    data = {}
 
-    if os.path.isfile(os.path.expanduser(CACHE_PATH)):
-        with open(os.path.expanduser(CACHE_PATH), 'rb') as pickle_db:
-            data = pickle.load(pickle_db)
-        if key in data:
-            logging.debug(f'Loading "{key}" cache from file.')
-            return data[key]
-    else:
+def _read_cache():
+    import pickle
+
+    if not os.path.isfile(os.path.expanduser(CACHE_PATH)):
         logging.debug('Generating cache file.')
+        return {}
+    with open(os.path.expanduser(CACHE_PATH), 'rb') as pickle_db:
+        return pickle.load(pickle_db)
+
+
+def load_cache(*, provider, generator):
+    key = provider.__class__.__name__
+
+    with cache_lock:
+        data = _read_cache()
+    if key in data:
+        logging.debug(f'Loading "{key}" cache from file.')
+        return data[key]
 
     logging.debug(f'Generating "{key}" cache.')
-    data[key] = generator()
-    with open(os.path.expanduser(CACHE_PATH), 'wb') as pickle_db:
-        pickle.dump(data, pickle_db, protocol=2)
-    return data[key]
+    return update_cache(provider=provider, value=generator())
+
+
+def update_cache(*, provider, value):
+    import pickle
+
+    key = provider.__class__.__name__
+
+    with cache_lock:
+        data = _read_cache()
+        data[key] = value
+        # Replace the file in one step, so that an interrupted write can't
+        # leave a truncated cache behind.
+        cache_path = os.path.expanduser(CACHE_PATH)
+        with open(cache_path + '.tmp', 'wb') as pickle_db:
+            pickle.dump(data, pickle_db, protocol=2)
+        os.replace(cache_path + '.tmp', cache_path)
+    return value
+
+
+class ApplicationDatabase(object):
+
+    """The applications found by ApplicationProvider, as parallel arrays.
+
+    The database stays resident (and is pickled to the cache) as a handful
+    of flat sequences rather than one object per application. Searching
+    runs over a single string holding every application's casefolded
+    "name\nexec" key, each ended by a NUL, so queries allocate nothing per
+    application.
+    """
+
+    __slots__ = ('paths', 'names', 'icons', 'mtimes', 'search_text',
+                 'offsets')
+
+    def __init__(self, entries=()):
+        """Build from (path, name, icon, search key, mtime) tuples."""
+        paths, names, icons, keys, mtimes = list(zip(*entries)) or [()] * 5
+        self.paths = paths
+        self.names = names
+        self.icons = icons
+        self.mtimes = array.array('d', mtimes)
+        self.search_text = ''.join(key + '\0' for key in keys)
+        self.offsets = array.array('L', [0])
+        for key in keys:
+            self.offsets.append(self.offsets[-1] + len(key) + 1)
+
+    @staticmethod
+    def search_key(name, exec_):
+        # Separated so that a search can't match across name and command.
+        return f'{name}\n{exec_}'.casefold()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def nbytes(self):
+        """Estimate the memory held by the database."""
+        return (sum(map(sys.getsizeof, self.paths)) +
+                sum(map(sys.getsizeof, self.names)) +
+                sum(map(sys.getsizeof, self.icons)) +
+                sys.getsizeof(self.search_text) +
+                sys.getsizeof(self.offsets) + sys.getsizeof(self.mtimes) +
+                3 * sys.getsizeof(self.paths))
+
+    def entry(self, index):
+        return (self.paths[index], self.names[index], self.icons[index],
+                self.search_text[self.offsets[index]:
+                                 self.offsets[index + 1] - 1],
+                self.mtimes[index])
+
+    def find(self, search):
+        """Return the indices of the applications matching a search."""
+        search = search.casefold()
+        indices = []
+        found = self.search_text.find(search)
+        while found >= 0:
+            index = bisect.bisect_right(self.offsets, found) - 1
+            indices.append(index)
+            # Skip the rest of this application's key.
+            found = self.search_text.find(search, self.offsets[index + 1])
+        return indices
 
 
 class ApplicationProvider(object):
 
     def __init__(self):
-        self.app_db = load_cache(provider=self, generator=self._do_walk)
-
-    def _do_walk(self):
+        self.app_db = self._load()
+
+    def _load(self):
+        app_db = load_cache(provider=self, generator=self._do_walk)
+        if not isinstance(app_db, ApplicationDatabase):
+            logging.debug('Regenerating outdated application cache.')
+            app_db = update_cache(provider=self, value=self._do_walk())
+        return app_db
+
+    def _database(self):
+        # Reload from the cache file if dropped while idle (see trim).
+        app_db = self.app_db
+        if app_db is None:
+            app_db = self.app_db = self._load()
+        return app_db
+
+    def trim(self, budget):
+        if self.app_db is not None and self.app_db.nbytes() > budget:
+            logging.debug('Dropping application database while idle.')
+            self.app_db = None
+
+    def refresh(self):
+        """Rescan the desktop paths, re-reading only files that changed."""
+        self.app_db = update_cache(
+            provider=self, value=self._do_walk(previous=self._database()))
+
+    def _do_walk(self, previous=None):
         NO_DISPLAY_PATTERN = (
             re.compile(r'^\s*NoDisplay\s*=\s*true\s*$', flags=re.MULTILINE))
         NAME_PATTERN = re.compile(r'^\s*Name\s*=\s*(.*)\s*$', flags=re.MULTILINE)
@@ -267,8 +798,16 @@ class ApplicationProvider(object):
                 for file_name in file_names:
                     paths.append(os.path.join(directory, file_name))
 
-        database = []
+        if previous is None:
+            previous = ApplicationDatabase()
+        known = {path: index for index, path in enumerate(previous.paths)}
+
+        entries = []
         for path in paths:
+            mtime = os.stat(path).st_mtime
+            if path in known and previous.mtimes[known[path]] == mtime:
+                entries.append(previous.entry(known[path]))
+                continue
             with open(path) as desktop_file:
                 contents = desktop_file.read()
                 if NO_DISPLAY_PATTERN.search(contents):
@@ -276,27 +815,31 @@ class ApplicationProvider(object):
                 name = NAME_PATTERN.search(contents)
                 icon = ICON_PATTERN.search(contents)
                 exec_ = EXEC_PATTERN.search(contents)
-                database.append({'path': path,
-                                'name': name.group(1) if name else '',
-                                'icon': icon.group(1) if icon else None,
-                                'exec': exec_.group(1) if exec_ else ''
-                                })
-
-        return database
+                name = name.group(1) if name else ''
+                entries.append((path, name, icon.group(1) if icon else None,
+                                ApplicationDatabase.search_key(
+                                    name, exec_.group(1) if exec_ else ''),
+                                mtime))
 
+        return ApplicationDatabase(entries)
 
     def provide(self, search):
-        for app in self.app_db:
-            if ((search and (search.lower() in app['name'].lower() or
-                             search.lower() in app['exec'].lower())) or
-                    (not search and app['name'] in
-                        config_options['favorite apps'])):
-                item = (QListWidgetItem(QIcon.fromTheme(app['icon'], QIcon(app['icon'])), app['name'])
-                        if app['icon'] else QListWidgetItem(app['name']))
-                item.setData(ItemTypeRole, 'application')
-                item.setData(ItemDataRole, app['path'])
-                item.setSizeHint(QSize(1, config_options['icon size'] + 4))
-                yield item
+        # A refresh may replace the database meanwhile; stick to this one.
+        app_db = self._database()
+        if search:
+            indices = app_db.find(search)
+        else:
+            favorites = set(config_options['favorite apps'])
+            indices = [index for index, name in enumerate(app_db.names)
+                       if name in favorites]
+        for index in indices:
+            name, icon = app_db.names[index], app_db.icons[index]
+            item = (QListWidgetItem(QIcon.fromTheme(icon, QIcon(icon)), name)
+                    if icon else QListWidgetItem(name))
+            item.setData(ItemTypeRole, 'application')
+            item.setData(ItemDataRole, app_db.paths[index])
+            item.setSizeHint(QSize(1, config_options['icon size'] + 4))
+            yield item
         yield False
 
 
@@ -305,10 +848,33 @@ class DirectoryProvider(object):
     def __init__(self):
         self._user_places_cache = load_cache(
             provider=self, generator=self._generate_user_places_cache)
+        self._favorites = self._list_favorites()
+
+    def refresh_user_places(self):
+        self._user_places_cache = update_cache(
+            provider=self, value=self._generate_user_places_cache())
+
+    def refresh_favorites(self):
+        self._favorites = self._list_favorites()
+
+    def _list_favorites(self):
+        import glob
+
+        if not config_options['favorites directory']:
+            return []
+        # Don't bother filtering out files, because it might be useful
+        # use case anyway.
+        return sorted(glob.glob(os.path.expanduser(os.path.expandvars(
+            config_options['favorites directory'] + '/*'))))
 
     def _generate_user_places_cache(self):
+        import xml.etree.ElementTree as ET
+
         cache = {}
-        root = ET.parse('/home/ml/.local/share/user-places.xbel').getroot()
+        if not os.path.isfile(os.path.expanduser(USER_PLACES_PATH)):
+            # Not running KDE, or no places bookmarked yet.
+            return cache
+        root = ET.parse(os.path.expanduser(USER_PLACES_PATH)).getroot()
         for bookmark in root.findall('bookmark'):
             only_in_app = bookmark.find('info/metadata/OnlyInApp') is not None
             is_hidden_temp = bookmark.find('info/metadata/IsHidden')
@@ -339,14 +905,13 @@ class DirectoryProvider(object):
         return item
 
     def provide(self, search):
+        import glob
+
         if not search:
             for title in sorted(self._user_places_cache):
                 yield self._item_from_path(self._user_places_cache[title], title)
 
-            for path in sorted(glob.glob(os.path.expanduser(os.path.expandvars(
-                    config_options['favorites directory'] + '/*')))):
-                # Don't bother filtering out files, because it might be useful
-                # use case anyway.
+            for path in self._favorites:
                 yield self._item_from_path(path)
 
             yield False
@@ -374,13 +939,20 @@ class OpenWindowProvider(object):
 
     def _update(self):
         self._last_time = time.time()
-        out = subprocess.check_output(['wmctrl', '-l']).decode('utf-8').strip()
+        try:
+            out = executor.check_output(['wmctrl', '-l']).decode('utf-8').strip()
+            out2 = executor.check_output(['wmctrl', '-d']).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError,
+                subprocess.TimeoutExpired) as err:
+            # Keep the previous windows; retried once they are stale again.
+            logging.error(f'Could not list windows: {err}')
+            return
+
         if not out:
             self._cache = []
         else:
             self._cache = [x.split(maxsplit=3) for x in out.split('\n')]
 
-        out2 = subprocess.check_output(['wmctrl', '-d']).decode('utf-8').strip()
         desktops = [x.split() for x in out2.split('\n')]
         try:
             self._desktop = next(x[0] for x in desktops if x[1] == '*')
@@ -391,6 +963,11 @@ class OpenWindowProvider(object):
             # no windows in this case, I think this is a fair behaviour.
             self._desktop = None
 
+    def trim(self, budget):
+        # Stale by the time the launcher is idle anyway.
+        self._cache = []
+        self._last_time = 0
+
     def provide(self, search):
         # Refresh if more than 3 seconds stale
         if time.time() - self._last_time > 3:
@@ -527,6 +1104,9 @@ class ChromeBookmarkProvider(object):
 def items_from_search(providers, search):
     items = []
     for provider in providers:
+        if provider is None:
+            # Still initializing in the background.
+            continue
         for result in provider.provide(search.strip()):
             if isinstance(result, QListWidgetItem):
                 items.append(result)
@@ -555,13 +1135,134 @@ class SearchWorker(QObject):
         self.finished.emit()
 
 
+class ProviderLoader(QObject):
+
+    """Construct providers off the UI thread, announcing each when ready."""
+
+    finished = pyqtSignal()
+    provider_ready = pyqtSignal(int, object)
+
+    def __init__(self, factories):
+        QObject.__init__(self)
+        self.factories = factories
+
+    def process(self):
+        for index, factory in enumerate(self.factories):
+            start = time.perf_counter()
+            try:
+                provider = factory()
+            except Exception:
+                logging.exception(f'Could not initialize "{factory.__name__}".')
+                continue
+            mark_startup(f'{factory.__name__} ready '
+                         f'({(time.perf_counter() - start) * 1000:.1f} ms init)')
+            self.provider_ready.emit(index, provider)
+        self.finished.emit()
+
+
+class ProviderRefresher(QObject):
+
+    """Run provider refresh methods off the UI thread."""
+
+    finished = pyqtSignal()
+
+    def __init__(self, refreshes):
+        QObject.__init__(self)
+        self.refreshes = refreshes
+
+    def process(self):
+        for refresh in self.refreshes:
+            try:
+                refresh()
+            except Exception:
+                logging.exception(f'Could not refresh "{refresh.__qualname__}".')
+        self.finished.emit()
+
+
 class Searcher(object):
 
     def __init__(self):
         self._last_worker_time = 0
         self._threads = []
+        self._loader = None
+        self._refreshers = []
+        self._queued_refreshes = []
         self.workers = []
-        self.providers = ()
+        self.providers = []
+
+    def load_providers(self, factories, on_finished=None):
+        """Replace all providers, building them in a background thread.
+
+        The slots are filled in order as each provider finishes initializing,
+        so the window is usable (and searchable) before the slow ones are.
+        """
+        thread = QThread()
+        loader = ProviderLoader(factories)
+        loader.moveToThread(thread)
+
+        self.providers = [None] * len(factories)
+        self._loader = (thread, loader)
+
+        def on_loader_finished():
+            thread.quit()
+            thread.wait()
+            if on_finished is not None:
+                on_finished()
+
+        thread.started.connect(loader.process)
+        loader.provider_ready.connect(
+            functools.partial(self.set_provider, loader))
+        loader.finished.connect(on_loader_finished)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+
+    def find_provider(self, provider_class):
+        """Return the loaded provider of the given class, if any."""
+        return next((provider for provider in self.providers
+                     if isinstance(provider, provider_class)), None)
+
+    def refresh_providers(self, refreshes):
+        """Run the given refresh methods in a background thread.
+
+        Other providers are left alone, and the current search is re-run
+        once the refreshes are done. Only one refresher runs at a time;
+        refreshes requested meanwhile are queued (once each) and run after
+        it, so an older scan can't finish last and overwrite a newer one.
+        """
+        for refresh in refreshes:
+            if refresh not in self._queued_refreshes:
+                self._queued_refreshes.append(refresh)
+        if not self._refreshers:
+            self._start_refresher()
+
+    def _start_refresher(self):
+        refreshes, self._queued_refreshes = self._queued_refreshes, []
+        thread = QThread()
+        refresher = ProviderRefresher(refreshes)
+        refresher.moveToThread(thread)
+
+        def on_refresher_finished():
+            thread.quit()
+            thread.wait()
+            self._refreshers.remove(refresher)
+            if self._queued_refreshes:
+                self._start_refresher()
+            self.search(search_bar.text())
+
+        thread.started.connect(refresher.process)
+        refresher.finished.connect(on_refresher_finished)
+        thread.finished.connect(thread.deleteLater)
+
+        self._threads.append(thread)
+        self._refreshers.append(refresher)
+        thread.start()
+
+    def set_provider(self, loader, index, provider):
+        # Ignore stragglers from a loader that has since been replaced.
+        if self._loader is None or self._loader[1] is not loader:
+            return
+        self.providers[index] = provider
+        self.search(search_bar.text())
 
     def repopulate(self, worker, items):
         # Ensure that a slow-to-execute previous search doesn't override
@@ -585,13 +1286,21 @@ class Searcher(object):
         logging.debug('Doing search.')
         thread = QThread()
 
-        worker = SearchWorker(self.providers, text, time.time())
+        worker = SearchWorker(tuple(self.providers), text, time.time())
         worker.moveToThread(thread)
 
         def on_worker_finished():
+            # Disconnect and delete before stopping the thread: the worker and
+            # PyQt's slot proxies for it live there, and their deferred
+            # deletion only happens while the thread is finishing. Otherwise
+            # the proxies keep these closures, the worker and the thread
+            # alive for good.
+            thread.started.disconnect()
+            worker.new_items.disconnect()
+            worker.finished.disconnect()
+            worker.deleteLater()
             thread.quit()
             thread.wait()
-            worker.deleteLater()
 
         thread.started.connect(worker.process)
         worker.finished.connect(on_worker_finished)
@@ -609,33 +1318,111 @@ class Searcher(object):
         search_bar.setPalette(palette)
 
         # Clean up old threads.
+        self.trim()
+
+    def trim(self):
+        """Forget threads and workers that Qt has already deleted."""
         self._threads = [thread for thread in self._threads
                          if not sip.isdeleted(thread)]
         self.workers = [worker for worker in self.workers
                         if not sip.isdeleted(worker)]
 
 
+def read_desktop_entry(path):
+    """Return the keys of the [Desktop Entry] group of a .desktop file."""
+    entry = {}
+    in_group = False
+    with open(path) as desktop_file:
+        for line in desktop_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('['):
+                in_group = line == '[Desktop Entry]'
+            elif in_group and '=' in line:
+                key, value = line.split('=', 1)
+                entry[key.strip()] = value.strip()
+    return entry
+
+
+def expand_exec(entry, path):
+    """Expand the Exec key of a desktop entry into an argument list.
+
+    Field codes are expanded as per the Desktop Entry Specification, with no
+    files or URLs to pass. Returns None if the entry needs something only
+    the open command provides (a terminal, a working directory or D-Bus
+    activation).
+    """
+    if (entry.get('Terminal') == 'true' or entry.get('Path') or
+            entry.get('DBusActivatable') == 'true' or not entry.get('Exec')):
+        return None
+
+    exec_ = re.sub(r'\\(.)', lambda match: DESKTOP_STRING_ESCAPES.get(
+        match.group(1), match.group(0)), entry['Exec'])
+    # Inside double quotes the spec also escapes "$" and "`", which shlex
+    # would leave as they are. (Pairs are matched left to right, so "\\$"
+    # stays an escaped backslash followed by "$".)
+    exec_ = re.sub(r'"(?:[^"\\]|\\.)*"', lambda quoted: re.sub(
+        r'\\(.)', lambda match: (match.group(1) if match.group(1) in '$`'
+                                 else match.group(0)),
+        quoted.group(0)), exec_)
+    try:
+        words = shlex.split(exec_)
+    except ValueError:
+        logging.warning(f'Malformed Exec key in "{path}".')
+        return None
+
+    values = {'c': entry.get('Name', ''), 'k': path, '%': '%'}
+    args = []
+    for word in words:
+        if word == '%i':
+            if entry.get('Icon'):
+                args += ['--icon', entry['Icon']]
+        elif word not in DROPPED_FIELD_CODES:
+            args.append(re.sub('%(.)', lambda match: values.get(
+                match.group(1), ''), word))
+    return args or None
+
+
+def launch_desktop_entry(path):
+    """Start the program of a .desktop file without the open command.
+
+    Returns False if the entry has to be left to the open command instead.
+    """
+    try:
+        args = expand_exec(read_desktop_entry(path), path)
+        if args is None:
+            return False
+        executor.spawn_direct(args)
+    except (OSError, UnicodeDecodeError) as err:
+        logging.warning(f'Could not launch "{path}" directly: {err}')
+        return False
+    return True
+
+
 def launch_item(item):
     if item is None:
         logging.warning('Nothing to open!')
         return
 
     if item.data(ItemTypeRole) == 'application':
-        subprocess.Popen(config_options['open command'].split() + [item.data(ItemDataRole)])
+        if not (config_options['direct launch'] and
+                launch_desktop_entry(item.data(ItemDataRole))):
+            executor.spawn(config_options['open command'].split() + [item.data(ItemDataRole)])
     elif item.data(ItemTypeRole) == 'file':
         if os.path.isdir(item.data(ItemDataRole)):
             # Open folders as-is.
-            subprocess.Popen(config_options['file manager command'].split() + [item.data(ItemDataRole)])
+            executor.spawn(config_options['file manager command'].split() + [item.data(ItemDataRole)])
         else:
             # Select files without opening their respective program.
-            subprocess.Popen(config_options['reveal in file manager command'].split() + [item.data(ItemDataRole)])
+            executor.spawn(config_options['reveal in file manager command'].split() + [item.data(ItemDataRole)])
     elif item.data(ItemTypeRole) == 'url':
-        subprocess.Popen(['x-www-browser', item.data(ItemDataRole)])
+        executor.spawn(['x-www-browser', item.data(ItemDataRole)])
     elif item.data(ItemTypeRole) == 'executable':
-        subprocess.Popen(item.data(ItemDataRole), shell=True)
+        executor.spawn(item.data(ItemDataRole), shell=True)
     elif item.data(ItemTypeRole) == 'wid':
         wid = item.data(ItemDataRole)
-        subprocess.Popen(['wmctrl', '-i', '-a', item.data(ItemDataRole)])
+        executor.spawn(['wmctrl', '-i', '-a', item.data(ItemDataRole)])
     elif item.data(ItemTypeRole) == 'reset_cache':
         clear_cache()
         return
@@ -674,7 +1461,8 @@ def clear_cache():
     os.remove(os.path.expanduser(CACHE_PATH))
     reload_config()
     logging.debug('Cache cleared!')
-    searcher.providers = make_providers()
+    searcher.load_providers(provider_factories())
+    config_watcher.rewatch()
     clear_search()
 
 
@@ -685,7 +1473,9 @@ def reload_config():
             f.write(DEFAULT_CONFIG)
     try:
         with open(os.path.expanduser(CONFIG_PATH)) as f:
-            config_options = json.loads(f.read())
+            # Options added since the file was written keep their defaults.
+            config_options = json.loads(DEFAULT_CONFIG)
+            config_options.update(json.loads(f.read()))
     except Exception as err:
         logging.error(str(err))
         logging.warning('Using default configuration options.')
@@ -697,11 +1487,170 @@ def reload_config():
     result_list_widget.setIconSize(QSize(*(config_options['icon size'],) * 2))
 
 
-def make_providers():
+class ConfigWatcher(QObject):
+
+    """Watch configuration and data files, refreshing affected providers.
+
+    Only the providers that depend on a changed file are refreshed; the
+    others keep their state.
+    """
+
+    # Wait for a burst of change notifications (e.g. an editor saving via a
+    # temporary file) to settle before refreshing.
+    SETTLE_MS = 250
+
+    def __init__(self):
+        QObject.__init__(self)
+        self._paths = {}
+        self._pending = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.SETTLE_MS)
+        self._timer.timeout.connect(self._apply)
+        self.rewatch()
+
+    def rewatch(self):
+        """(Re-)register the watched paths for the current configuration."""
+        targets = [(os.path.expanduser(CONFIG_PATH), 'config'),
+                   (os.path.expanduser(USER_PLACES_PATH), 'user places')]
+        if config_options['favorites directory']:
+            targets.append((os.path.expanduser(os.path.expandvars(
+                config_options['favorites directory'])), 'favorites'))
+        for path_dir in map(os.path.expanduser, config_options['desktop paths']):
+            targets.append((path_dir, 'applications'))
+            for directory, __, file_names in os.walk(path_dir):
+                targets.append((directory, 'applications'))
+                # Directories only notice files being added or removed, not
+                # edited in place.
+                targets.extend((os.path.join(directory, file_name),
+                                'applications')
+                               for file_name in file_names
+                               if file_name.endswith('.desktop'))
+
+        # Map each watched path to the (kind, missing target) pairs it stands
+        # for. A path that doesn't exist yet is watched through its nearest
+        # existing parent, which only counts as changed once the target
+        # appears; other changes there (e.g. GTK rewriting
+        # ~/.local/share/recently-used.xbel) are ignored.
+        paths = {}
+        for target, kind in targets:
+            path = target
+            while not os.path.exists(path) and os.path.dirname(path) != path:
+                path = os.path.dirname(path)
+            paths.setdefault(path, []).append(
+                (kind, None if path == target else target))
+
+        # Files replaced by rename drop out of the watcher, so always re-add.
+        if self._watcher.files() or self._watcher.directories():
+            self._watcher.removePaths(self._watcher.files() +
+                                      self._watcher.directories())
+        existing = [path for path in paths if os.path.exists(path)]
+        if existing:
+            self._watcher.addPaths(existing)
+        self._paths = paths
+
+    def _on_changed(self, path):
+        logging.debug(f'"{path}" changed.')
+        kinds = {kind for kind, missing in self._paths.get(path, ())
+                 if missing is None or os.path.exists(missing)}
+        if kinds:
+            self._pending |= kinds
+            self._timer.start()
+
+    def _apply(self):
+        changed, self._pending = self._pending, set()
+
+        if 'config' in changed:
+            old_options = config_options
+            reload_config()
+            if (old_options['desktop paths'] !=
+                    config_options['desktop paths']):
+                changed.add('applications')
+            if (old_options['favorites directory'] !=
+                    config_options['favorites directory']):
+                changed.add('favorites')
+            # NOTE: "favorite apps" is read on every search, so it needs no
+            # refresh.
+
+        refreshes = []
+        directory_provider = searcher.find_provider(DirectoryProvider)
+        if directory_provider is not None:
+            if 'user places' in changed:
+                refreshes.append(directory_provider.refresh_user_places)
+            if 'favorites' in changed:
+                refreshes.append(directory_provider.refresh_favorites)
+        application_provider = searcher.find_provider(ApplicationProvider)
+        if application_provider is not None and 'applications' in changed:
+            refreshes.append(application_provider.refresh)
+
+        self.rewatch()
+        if refreshes:
+            searcher.refresh_providers(refreshes)
+        elif 'config' in changed:
+            searcher.search(search_bar.text())
+
+
+def release_free_memory():
+    """Ask the C allocator to return freed memory to the system (glibc)."""
+    import ctypes
+
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class IdleReclaimer(QObject):
+
+    """Free memory once the window has been hidden for "idle timeout" seconds.
+
+    Drops the result items, forgets finished search workers, lets providers
+    drop caches larger than "idle cache budget" MiB (and stop the sympy
+    subprocess), then returns what it can to the system.
+    """
+
+    def __init__(self, window):
+        QObject.__init__(self)
+        self._reclaimed = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.reclaim)
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Hide:
+            timeout = config_options['idle timeout']
+            if timeout is not None and timeout >= 0:
+                self._timer.start(int(timeout * 1000))
+        elif event.type() == QEvent.Show:
+            self._timer.stop()
+            if self._reclaimed:
+                self._reclaimed = False
+                searcher.search(search_bar.text())
+        return False
+
+    def reclaim(self):
+        logging.debug('Reclaiming memory while idle.')
+        result_list_widget.clear()
+        searcher.trim()
+        budget = config_options['idle cache budget'] * 2 ** 20
+        for provider in searcher.providers:
+            if hasattr(provider, 'trim'):
+                provider.trim(budget)
+        executor.trim()
+        gc.collect()
+        release_free_memory()
+        self._reclaimed = True
+
+
+def provider_factories():
     # TODO: should make configurable with config file
-    return (ResetCacheProvider(),
-             DictionaryProvider(), CalculatorProvider(), DirectoryProvider(),
-             OpenWindowProvider(), CommandLineProvider(),ApplicationProvider())
+    return (ResetCacheProvider, CommandStatsProvider,
+            DictionaryProvider, CalculatorProvider, DirectoryProvider,
+            OpenWindowProvider, CommandLineProvider, ApplicationProvider)
 
 
 class KeyBindingEventFilter(QObject):
@@ -725,71 +1674,95 @@ class KeyBindingEventFilter(QObject):
 
 
 
-app = QApplication(sys.argv)
+def build_window():
+    """Create the launcher window and start loading the providers."""
+    global main_window, search_bar, result_list_widget, searcher
+    global config_watcher, idle_reclaimer
 
-def on_launch(*, first_instance):
-    if first_instance:
-        app.setQuitOnLastWindowClosed(False)
-    else:
-        if main_window.isVisible():
-            close()
-        else:
-            main_window.show()
-            search_bar.setFocus(True)
-    return 0
+    main_window = QWidget()
+
+    shortcut = QShortcut(QKeySequence(Qt.CTRL + Qt.Key_Q), main_window)
+    shortcut.activated.connect(QApplication.quit)
 
+    main_window.setWindowTitle(WINDOW_TITLE)
 
-x = Lock('spamalot_launcher')
-x.ready.connect(lambda: on_launch(first_instance=True))
-x.blocked.connect(lambda: sys.exit(0))
-x.awoken.connect(lambda: on_launch(first_instance=False))
-x.apply()
+    main_window.setWindowFlags(Qt.FramelessWindowHint)
+    main_window.show()
 
-main_window = QWidget()
+    layout = QVBoxLayout(main_window)
 
-shortcut = QShortcut(QKeySequence(Qt.CTRL + Qt.Key_Q), main_window)
-shortcut.activated.connect(QApplication.quit)
+    search_bar = QLineEdit()
+    search_bar.returnPressed.connect(launch_active_item)
 
-main_window.setWindowTitle(WINDOW_TITLE)
+    layout.addWidget(search_bar)
 
-main_window.setWindowFlags(Qt.FramelessWindowHint)
-main_window.show()
+    result_list_widget = QListWidget()
 
-layout = QVBoxLayout(main_window)
+    result_list_widget.setAlternatingRowColors(True)
+    result_list_widget.setTextElideMode(Qt.ElideMiddle)
+    result_list_widget.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+    result_list_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+    result_list_widget.currentItemChanged.connect(autofill_search)
+    result_list_widget.itemActivated.connect(launch_item)
 
-search_bar = QLineEdit()
-search_bar.returnPressed.connect(launch_active_item)
+    # Prepare alternating row colors for transparency
+    palette = result_list_widget.palette()
+    color = palette.brush(QPalette.Base).color()
+    color.setAlphaF(0.9)
+    palette.setBrush(QPalette.Base, QBrush(color))
+    color = palette.brush(QPalette.AlternateBase).color()
+    color.setAlphaF(0.5)
+    palette.setBrush(QPalette.AlternateBase, QBrush(color))
+    main_window.setPalette(palette)
 
-layout.addWidget(search_bar)
+    layout.addWidget(result_list_widget)
+    main_window.installEventFilter(KeyBindingEventFilter(main_window))
 
-result_list_widget = QListWidget()
+    reload_config()
+    mark_startup('window built, config loaded')
+
+    searcher = Searcher()
+    # Show the window first; providers fill in the results as they become ready.
+    searcher.load_providers(provider_factories(),
+                            on_finished=print_startup_timeline)
+    searcher.search('')  # Populate with favorite applications.
+    # Not using text changed to allow for programmatic updates via selection changes
+    search_bar.textEdited.connect(searcher.search)
+    config_watcher = ConfigWatcher()
+    idle_reclaimer = IdleReclaimer(main_window)
+
+
+def main():
+    global app, executor
+
+    app = QApplication(sys.argv)
+    mark_startup('QApplication')
+
+    executor = CommandExecutor()
+
+    def on_launch(*, first_instance):
+        if first_instance:
+            app.setQuitOnLastWindowClosed(False)
+        else:
+            if main_window.isVisible():
+                close()
+            else:
+                main_window.show()
+                search_bar.setFocus(True)
+        return 0
 
-result_list_widget.setAlternatingRowColors(True)
-result_list_widget.setTextElideMode(Qt.ElideMiddle)
-result_list_widget.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
-result_list_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-result_list_widget.currentItemChanged.connect(autofill_search)
-result_list_widget.itemActivated.connect(launch_item)
 
-# Prepare alternating row colors for transparency
-palette = result_list_widget.palette()
-color = palette.brush(QPalette.Base).color()
-color.setAlphaF(0.9)
-palette.setBrush(QPalette.Base, QBrush(color))
-color = palette.brush(QPalette.AlternateBase).color()
-color.setAlphaF(0.5)
-palette.setBrush(QPalette.AlternateBase, QBrush(color))
-main_window.setPalette(palette)
+    x = Lock('spamalot_launcher')
+    x.ready.connect(lambda: on_launch(first_instance=True))
+    x.blocked.connect(lambda: sys.exit(0))
+    x.awoken.connect(lambda: on_launch(first_instance=False))
+    x.apply()
 
-layout.addWidget(result_list_widget)
-main_window.installEventFilter(KeyBindingEventFilter(main_window))
+    build_window()
+    QTimer.singleShot(0, lambda: mark_startup('event loop running'))
 
-reload_config()
+    sys.exit(app.exec_())
 
-searcher = Searcher()
-searcher.providers = make_providers()
-searcher.search('')  # Populate with favorite applications.
-# Not using text changed to allow for programmatic updates via selection changes
-search_bar.textEdited.connect(searcher.search)
 
-sys.exit(app.exec_())
+if __name__ == '__main__':
+    main()